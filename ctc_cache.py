@@ -0,0 +1,39 @@
+"""Disk cache for traccuracy's load_ctc_data"""
+import hashlib
+import pickle
+from importlib.metadata import version
+from pathlib import Path
+
+from traccuracy.loaders import load_ctc_data
+
+CACHE_DIR = Path(__file__).resolve().parent / ".ctc_cache"
+
+def load_ctc_data_cached(data_dir, track_path, **kwargs):
+    """Same as load_ctc_data, reused from disk until the masks or track file change"""
+    data_dir, track_path = Path(data_dir), Path(track_path)
+
+    # One entry per (data_dir, track_path); the suffix keys on the arguments,
+    # the traccuracy version and name, size and mtime of every input file
+    prefix = hashlib.sha1(repr((
+        str(data_dir.resolve()), str(track_path.resolve())
+    )).encode()).hexdigest()
+    key = hashlib.sha1(repr((sorted(kwargs.items()), version("traccuracy"))).encode())
+    for f in sorted(data_dir.glob("*.tif*")) + [track_path]:
+        stat = f.stat()
+        key.update(f"{f.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    cache_file = CACHE_DIR / f"{prefix}-{key.hexdigest()}.pkl"
+
+    if cache_file.exists():
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+
+    data = load_ctc_data(str(data_dir), str(track_path), **kwargs)
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Evict entries superseded by this one
+    for stale in CACHE_DIR.glob(f"{prefix}-*.pkl"):
+        stale.unlink(missing_ok=True)
+    tmp_file = cache_file.with_suffix(".tmp")
+    with open(tmp_file, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_file.replace(cache_file)
+    return data
@@ -1,14 +1,29 @@
 """Simple tracking evaluation without ground truth"""
 import numpy as np
 from pathlib import Path
-from traccuracy. loaders import load_ctc_data
+from numba import njit, prange
+from ctc_cache import load_ctc_data_cached
+
+# Explicit signatures compile eagerly and are cached, so runs pay no JIT warmup;
+# masks are cast to uint16/uint32 before the call to match them
+@njit(['uint8[:, ::1](uint16[:, :, ::1], int64)',
+       'uint8[:, ::1](uint32[:, :, ::1], int64)'],
+      parallel=True, cache=True)
+def presence_matrix(masks, max_id):
+    """Mark which label ids are present in each frame, shape (T, max_id + 1)"""
+    P = np.zeros((masks.shape[0], max_id + 1), np.uint8)
+    for t in prange(masks.shape[0]):
+        flat = masks[t].ravel()
+        for i in range(flat.size):
+            P[t, flat[i]] = 1
+    return P
 
 def evaluate_tracks(result_path):
     track_file = result_path / "res_track.txt"
     if not track_file.exists():
         track_file = result_path / "man_track.txt"
     
-    pred = load_ctc_data(
+    pred = load_ctc_data_cached(
         str(result_path),
         str(track_file),
         run_checks=False,
@@ -16,48 +31,42 @@ def evaluate_tracks(result_path):
     )
     
     masks = pred. segmentation
+    max_id = int(masks.max())
+    masks = np.ascontiguousarray(masks, dtype=np.uint16 if max_id < 65536 else np.uint32)
     graph = pred.graph
     
     print("=" * 50)
     print("TRACKING EVALUATION (No Ground Truth)")
     print("=" * 50)
     
+    # Single sweep over the masks; every statistic below is a reduction of P
     num_frames = masks.shape[0]
-    all_track_ids = set()
-    for t in range(num_frames):
-        all_track_ids.update(np.unique(masks[t]))
-    all_track_ids. discard(0)
+    P = presence_matrix(masks, max_id)[:, 1:]
+    
+    all_track_ids = np.flatnonzero(P.any(axis=0)) + 1
     
     print(f"\nBasic Statistics:")
     print(f"  - Number of frames: {num_frames}")
     print(f"  - Total unique track IDs: {len(all_track_ids)}")
     
-    track_lengths = {}
-    for track_id in all_track_ids:
-        length = sum(1 for t in range(num_frames) if track_id in masks[t])
-        track_lengths[track_id] = length
-    
-    lengths = list(track_lengths.values())
+    lengths = P.sum(axis=0, dtype=np.int64)[all_track_ids - 1]
     print(f"\nTrack Length Statistics:")
     print(f"  - Average track length: {np.mean(lengths):.1f} frames")
     print(f"  - Median track length: {np.median(lengths):.1f} frames")
-    print(f"  - Min/Max track length: {min(lengths)}/{max(lengths)} frames")
-    print(f"  - Tracks < 3 frames (suspicious): {sum(1 for l in lengths if l < 3)}")
+    print(f"  - Min/Max track length: {lengths.min()}/{lengths.max()} frames")
+    print(f"  - Tracks < 3 frames (suspicious): {np.count_nonzero(lengths < 3)}")
     
-    new_tracks = []
-    prev_ids = set()
-    for t in range(num_frames):
-        curr_ids = set(np.unique(masks[t])) - {0}
-        new_tracks.append(len(curr_ids - prev_ids))
-        prev_ids = curr_ids
+    new_tracks = np.empty(num_frames, dtype=np.int64)
+    new_tracks[0] = P[0].sum(dtype=np.int64)
+    new_tracks[1:] = (P[1:] & ~P[:-1]).sum(axis=1, dtype=np.int64)
     
     print(f"\nFragmentation Indicators:")
     print(f"  - Avg new tracks per frame: {np.mean(new_tracks[1:]):.2f}")
     print(f"  - High values suggest track breaks/fragmentation")
     
-    counts = [len(np.unique(masks[t])) - 1 for t in range(num_frames)]
+    counts = P.sum(axis=1, dtype=np.int64)
     print(f"\nCell Count Consistency:")
-    print(f"  - Cell count range: {min(counts)} - {max(counts)}")
+    print(f"  - Cell count range: {counts.min()} - {counts.max()}")
     print(f"  - Cell count std dev: {np.std(counts):.2f}")
     
     print("\n" + "=" * 50)
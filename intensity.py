@@ -0,0 +1,18 @@
+"""Intensity rescaling for display"""
+import numpy as np
+
+def rescale_stack(img, pmin=5, pmax=99.9, step=4):
+    """Rescale each frame of a (T, Y, X, ...) stack so its pmin/pmax percentiles map to 0/1
+
+    Percentiles are estimated from every step-th pixel in y and x with a
+    partial sort, which is accurate enough for display. No clipping is applied.
+    """
+    flat = img[:, ::step, ::step].reshape(len(img), -1)
+    k_lo = int(pmin / 100 * (flat.shape[1] - 1))
+    k_hi = int(pmax / 100 * (flat.shape[1] - 1))
+    parted = np.partition(flat, [k_lo, k_hi], axis=1)
+    # (T, 1, 1, ...) so the bounds broadcast over every non-time axis
+    bounds_shape = (len(img),) + (1,) * (img.ndim - 1)
+    lo = parted[:, k_lo].reshape(bounds_shape).astype(np.float32)
+    hi = parted[:, k_hi].reshape(bounds_shape).astype(np.float32)
+    return (img.astype(np.float32) - lo) / np.maximum(hi - lo, 1e-12)
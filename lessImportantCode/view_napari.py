@@ -7,8 +7,10 @@ Loads time-series image sequences and corresponding Omnipose masks
 import napari
 import numpy as np
 from pathlib import Path
-from skimage import io
+import tifffile
 import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 def load_image_stack(image_folder, pattern="*.tiff"):
     """Load a stack of TIFF images from a folder"""
@@ -17,8 +19,7 @@ def load_image_stack(image_folder, pattern="*.tiff"):
         image_files = sorted(glob.glob(str(image_folder / "*.tif")))
     
     if image_files:
-        images = [io.imread(f) for f in image_files]
-        return np.array(images)
+        return tifffile.TiffSequence(image_files).asarray(ioworkers=os.cpu_count())
     return None
 
 def load_mask_stack(mask_folder):
@@ -26,11 +27,43 @@ def load_mask_stack(mask_folder):
     mask_files = sorted(glob.glob(str(mask_folder / "MASK_*.tif")))
     
     if mask_files:
-        masks = [io.imread(f) for f in mask_files]
-        return np.array(masks)
+        return tifffile.TiffSequence(mask_files).asarray(ioworkers=os.cpu_count())
     return None
 
 
+def load_positions(raw_root, mask_root, prefix, n=2):
+    """Load the first n positions of a dataset (the first 2 by default, as an example)
+
+    Returns ("image"/"labels", data, kwargs) layers and the status messages,
+    which main prints so concurrently loaded datasets don't interleave.
+    """
+    layers, messages = [], []
+    if not (raw_root.exists() and mask_root.exists()):
+        return layers, messages
+    
+    positions = sorted([p for p in raw_root.iterdir() if p.is_dir() and p.name.startswith("Pos")])
+    
+    for pos in positions[:n]:
+        pos_name = pos.name
+        
+        # Load raw images
+        aphase_folder = pos / "aphase"
+        if aphase_folder.exists():
+            image_stack = load_image_stack(aphase_folder)
+            if image_stack is not None:
+                layers.append(('image', image_stack, dict(
+                    name=f"{prefix}_{pos_name}_raw", colormap='gray',
+                    contrast_limits=np.percentile(image_stack[::4, ::4, ::4], [1, 99]))))
+                
+                # Load corresponding masks
+                mask_folder = mask_root / pos_name / "PreprocessedPhaseMasks"
+                if mask_folder.exists():
+                    mask_stack = load_mask_stack(mask_folder)
+                    if mask_stack is not None:
+                        layers.append(('labels', mask_stack, dict(name=f"{prefix}_{pos_name}_masks")))
+                        messages.append(f"Loaded {pos_name}: {len(image_stack)} raw images and {len(mask_stack)} masks")
+    
+    return layers, messages
 
 def main():
     # Base directory
@@ -45,51 +78,21 @@ def main():
     # Create napari viewer
     viewer = napari.Viewer()
     
-    # Load REF data (untreated cells, Positions 101-110)
-    if ref_raw.exists() and ref_masks.exists():
-        positions = sorted([p for p in ref_raw.iterdir() if p.is_dir() and p.name.startswith("Pos")])
-        
-        for pos in positions[:2]:  # Load first 2 positions as example
-            pos_name = pos.name
-            
-            # Load raw images
-            aphase_folder = pos / "aphase"
-            if aphase_folder.exists():
-                image_stack = load_image_stack(aphase_folder)
-                if image_stack is not None:
-                    viewer.add_image(image_stack, name=f"REF_{pos_name}_raw", 
-                                   colormap='gray', contrast_limits=[image_stack.min(), image_stack.max()])
-                    
-                    # Load corresponding masks
-                    mask_folder = ref_masks / pos_name / "PreprocessedPhaseMasks"
-                    if mask_folder.exists():
-                        mask_stack = load_mask_stack(mask_folder)
-                        if mask_stack is not None:
-                            viewer.add_labels(mask_stack, name=f"REF_{pos_name}_masks")
-                            print(f"Loaded {pos_name}: {len(image_stack)} raw images and {len(mask_stack)} masks")
+    # Load REF (untreated cells, Positions 101-110) and RIF10 (treated cells,
+    # Positions 201-210) concurrently
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        ref = ex.submit(load_positions, ref_raw, ref_masks, "REF")
+        rif = ex.submit(load_positions, rif_raw, rif_masks, "RIF10")
+        results = [ref.result(), rif.result()]
     
-    # Load RIF10 data (treated cells, Positions 201-210)
-    if rif_raw.exists() and rif_masks.exists():
-        positions = sorted([p for p in rif_raw.iterdir() if p.is_dir() and p.name.startswith("Pos")])
-        
-        for pos in positions[:2]:  # Load first 2 positions as example
-            pos_name = pos.name
-            
-            # Load raw images
-            aphase_folder = pos / "aphase"
-            if aphase_folder.exists():
-                image_stack = load_image_stack(aphase_folder)
-                if image_stack is not None:
-                    viewer.add_image(image_stack, name=f"RIF10_{pos_name}_raw",
-                                   colormap='gray', contrast_limits=[image_stack.min(), image_stack.max()])
-                    
-                    # Load corresponding masks
-                    mask_folder = rif_masks / pos_name / "PreprocessedPhaseMasks"
-                    if mask_folder.exists():
-                        mask_stack = load_mask_stack(mask_folder)
-                        if mask_stack is not None:
-                            viewer.add_labels(mask_stack, name=f"RIF10_{pos_name}_masks")
-                            print(f"Loaded {pos_name}: {len(image_stack)} raw images and {len(mask_stack)} masks")
+    for layers, messages in results:
+        for message in messages:
+            print(message)
+        for kind, data, kwargs in layers:
+            if kind == 'image':
+                viewer.add_image(data, **kwargs)
+            else:
+                viewer.add_labels(data, **kwargs)
     
     print("\nNapari viewer started with time-series data and segmentation masks.")
     print("Use the slider to navigate through time points.")
@@ -7,18 +7,19 @@ Ensures images and masks have matching dimensions (Time, Y, X)
 import napari
 import numpy as np
 from pathlib import Path
-from skimage import io
+import tifffile
 import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-def load_image_stack(image_folder, pattern="*.tiff"):
-    """Load a stack of TIFF images from a folder"""
+def load_image_stack(image_folder, messages, pattern="*.tiff"):
+    """Load a stack of TIFF images from a folder, appending any warnings to messages"""
     image_files = sorted(glob.glob(str(image_folder / pattern)))
     if not image_files and pattern == "*.tiff":
         image_files = sorted(glob.glob(str(image_folder / "*.tif")))
     
     if image_files:
-        images = [io.imread(f) for f in image_files]
-        stack = np.array(images)
+        stack = tifffile.TiffSequence(image_files).asarray(ioworkers=os.cpu_count())
         
         # Ensure 3D: (Time, Y, X) - squeeze out extra dimensions if present
         while stack.ndim > 3:
@@ -27,7 +28,7 @@ def load_image_stack(image_folder, pattern="*.tiff"):
                 stack = stack.squeeze(axis=1)
             # If there are multiple channels, take the first one (or you could do max projection)
             elif stack.ndim == 4:
-                print(f"Warning: Multi-channel image detected, taking first channel. Shape was {stack.shape}")
+                messages.append(f"Warning: Multi-channel image detected, taking first channel. Shape was {stack.shape}")
                 stack = stack[:, 0, :, :]  # Take first channel
             else:
                 break
@@ -40,8 +41,7 @@ def load_mask_stack(mask_folder):
     mask_files = sorted(glob.glob(str(mask_folder / "MASK_*.tif")))
     
     if mask_files:
-        masks = [io.imread(f) for f in mask_files]
-        stack = np.array(masks)
+        stack = tifffile.TiffSequence(mask_files).asarray(ioworkers=os.cpu_count())
         
         # Ensure 3D: (Time, Y, X) - squeeze out extra dimensions if present
         while stack.ndim > 3:
@@ -53,6 +53,70 @@ def load_mask_stack(mask_folder):
         return stack
     return None
 
+def load_positions(raw_root, mask_root, prefix, n=2):
+    """Load the first n positions of a dataset (the first 2 by default, as an example)
+
+    Returns ("image"/"labels", data, kwargs) layers and the status messages,
+    which main prints so concurrently loaded datasets don't interleave.
+    """
+    layers, messages = [], []
+    if not (raw_root.exists() and mask_root.exists()):
+        return layers, messages
+    
+    positions = sorted([p for p in raw_root.iterdir() if p.is_dir() and p.name.startswith("Pos")])
+    
+    for pos in positions[:n]:
+        pos_name = pos.name
+        
+        # Load raw images
+        aphase_folder = pos / "aphase"
+        if aphase_folder.exists():
+            image_stack = load_image_stack(aphase_folder, messages)
+            if image_stack is not None:
+                # Load corresponding masks
+                mask_folder = mask_root / pos_name / "PreprocessedPhaseMasks"
+                if mask_folder.exists():
+                    mask_stack = load_mask_stack(mask_folder)
+                    if mask_stack is not None:
+                        # Verify dimensions match
+                        if image_stack.shape != mask_stack.shape:
+                            messages.append(f"\n⚠️  WARNING: Dimension mismatch for {pos_name}!")
+                            messages.append(f"   Image shape: {image_stack.shape}")
+                            messages.append(f"   Mask shape:  {mask_stack.shape}")
+                            
+                            # Try to fix by matching time dimension
+                            min_time = min(image_stack.shape[0], mask_stack.shape[0])
+                            image_stack = image_stack[:min_time]
+                            mask_stack = mask_stack[:min_time]
+                            
+                            # Check spatial dimensions
+                            if image_stack.shape[1:] != mask_stack.shape[1:]:
+                                # Try to crop mask to match image dimensions
+                                img_h, img_w = image_stack.shape[1:]
+                                mask_h, mask_w = mask_stack.shape[1:]
+                                
+                                if mask_h >= img_h and mask_w >= img_w:
+                                    # Crop mask from top-left to match image
+                                    mask_stack = mask_stack[:, :img_h, :img_w]
+                                    messages.append(f"   ✓ Fixed by cropping mask to {image_stack.shape}")
+                                else:
+                                    messages.append(f"   ❌ Cannot fix: mask smaller than image, skipping {pos_name}")
+                                    continue
+                            else:
+                                messages.append(f"   ✓ Fixed by trimming to {min_time} timepoints")
+                        
+                        # Returned to main, which adds them to the viewer
+                        layers.append(('image', image_stack, dict(
+                            name=f"{prefix}_{pos_name}_raw", colormap='gray',
+                            contrast_limits=np.percentile(image_stack[::4, ::4, ::4], [1, 99]))))
+                        layers.append(('labels', mask_stack, dict(name=f"{prefix}_{pos_name}_masks")))
+                        
+                        messages.append(f"\n✓ Loaded {pos_name}:")
+                        messages.append(f"  - Shape: {image_stack.shape} (Time, Y, X)")
+                        messages.append(f"  - {len(image_stack)} timepoints")
+                        messages.append(f"  - Image and mask dimensions MATCH ✓")
+    
+    return layers, messages
 
 def main():
     # Base directory
@@ -71,114 +135,21 @@ def main():
     print("LOADING DATA FOR TRACKASTRA TRACKING")
     print("="*60)
     
-    # Load REF data (untreated cells, Positions 101-110)
-    if ref_raw.exists() and ref_masks.exists():
-        positions = sorted([p for p in ref_raw.iterdir() if p.is_dir() and p.name.startswith("Pos")])
-        
-        for pos in positions[:2]:  # Load first 2 positions as example
-            pos_name = pos.name
-            
-            # Load raw images
-            aphase_folder = pos / "aphase"
-            if aphase_folder.exists():
-                image_stack = load_image_stack(aphase_folder)
-                if image_stack is not None:
-                    # Load corresponding masks
-                    mask_folder = ref_masks / pos_name / "PreprocessedPhaseMasks"
-                    if mask_folder.exists():
-                        mask_stack = load_mask_stack(mask_folder)
-                        if mask_stack is not None:
-                            # Verify dimensions match
-                            if image_stack.shape != mask_stack.shape:
-                                print(f"\n⚠️  WARNING: Dimension mismatch for {pos_name}!")
-                                print(f"   Image shape: {image_stack.shape}")
-                                print(f"   Mask shape:  {mask_stack.shape}")
-                                
-                                # Try to fix by matching time dimension
-                                min_time = min(image_stack.shape[0], mask_stack.shape[0])
-                                image_stack = image_stack[:min_time]
-                                mask_stack = mask_stack[:min_time]
-                                
-                                # Check spatial dimensions
-                                if image_stack.shape[1:] != mask_stack.shape[1:]:
-                                    # Try to crop mask to match image dimensions
-                                    img_h, img_w = image_stack.shape[1:]
-                                    mask_h, mask_w = mask_stack.shape[1:]
-                                    
-                                    if mask_h >= img_h and mask_w >= img_w:
-                                        # Crop mask from top-left to match image
-                                        mask_stack = mask_stack[:, :img_h, :img_w]
-                                        print(f"   ✓ Fixed by cropping mask to {image_stack.shape}")
-                                    else:
-                                        print(f"   ❌ Cannot fix: mask smaller than image, skipping {pos_name}")
-                                        continue
-                                else:
-                                    print(f"   ✓ Fixed by trimming to {min_time} timepoints")
-                            
-                            # Add to viewer
-                            viewer.add_image(image_stack, name=f"REF_{pos_name}_raw", 
-                                           colormap='gray', contrast_limits=[image_stack.min(), image_stack.max()])
-                            viewer.add_labels(mask_stack, name=f"REF_{pos_name}_masks")
-                            
-                            print(f"\n✓ Loaded {pos_name}:")
-                            print(f"  - Shape: {image_stack.shape} (Time, Y, X)")
-                            print(f"  - {len(image_stack)} timepoints")
-                            print(f"  - Image and mask dimensions MATCH ✓")
+    # Load REF (untreated cells, Positions 101-110) and RIF10 (treated cells,
+    # Positions 201-210) concurrently
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        ref = ex.submit(load_positions, ref_raw, ref_masks, "REF")
+        rif = ex.submit(load_positions, rif_raw, rif_masks, "RIF10")
+        results = [ref.result(), rif.result()]
     
-    # Load RIF10 data (treated cells, Positions 201-210)
-    if rif_raw.exists() and rif_masks.exists():
-        positions = sorted([p for p in rif_raw.iterdir() if p.is_dir() and p.name.startswith("Pos")])
-        
-        for pos in positions[:2]:  # Load first 2 positions as example
-            pos_name = pos.name
-            
-            # Load raw images
-            aphase_folder = pos / "aphase"
-            if aphase_folder.exists():
-                image_stack = load_image_stack(aphase_folder)
-                if image_stack is not None:
-                    # Load corresponding masks
-                    mask_folder = rif_masks / pos_name / "PreprocessedPhaseMasks"
-                    if mask_folder.exists():
-                        mask_stack = load_mask_stack(mask_folder)
-                        if mask_stack is not None:
-                            # Verify dimensions match
-                            if image_stack.shape != mask_stack.shape:
-                                print(f"\n⚠️  WARNING: Dimension mismatch for {pos_name}!")
-                                print(f"   Image shape: {image_stack.shape}")
-                                print(f"   Mask shape:  {mask_stack.shape}")
-                                
-                                # Try to fix by matching time dimension
-                                min_time = min(image_stack.shape[0], mask_stack.shape[0])
-                                image_stack = image_stack[:min_time]
-                                mask_stack = mask_stack[:min_time]
-                                
-                                # Check spatial dimensions
-                                if image_stack.shape[1:] != mask_stack.shape[1:]:
-                                    # Try to crop mask to match image dimensions
-                                    img_h, img_w = image_stack.shape[1:]
-                                    mask_h, mask_w = mask_stack.shape[1:]
-                                    
-                                    if mask_h >= img_h and mask_w >= img_w:
-                                        # Crop mask from center or top-left
-                                        # Assuming padding might be on edges, crop to match
-                                        mask_stack = mask_stack[:, :img_h, :img_w]
-                                        print(f"   ✓ Fixed by cropping mask to {image_stack.shape}")
-                                    else:
-                                        print(f"   ❌ Cannot fix: mask smaller than image, skipping {pos_name}")
-                                        continue
-                                else:
-                                    print(f"   ✓ Fixed by trimming to {min_time} timepoints")
-                            
-                            # Add to viewer
-                            viewer.add_image(image_stack, name=f"RIF10_{pos_name}_raw",
-                                           colormap='gray', contrast_limits=[image_stack.min(), image_stack.max()])
-                            viewer.add_labels(mask_stack, name=f"RIF10_{pos_name}_masks")
-                            
-                            print(f"\n✓ Loaded {pos_name}:")
-                            print(f"  - Shape: {image_stack.shape} (Time, Y, X)")
-                            print(f"  - {len(image_stack)} timepoints")
-                            print(f"  - Image and mask dimensions MATCH ✓")
+    for layers, messages in results:
+        for message in messages:
+            print(message)
+        for kind, data, kwargs in layers:
+            if kind == 'image':
+                viewer.add_image(data, **kwargs)
+            else:
+                viewer.add_labels(data, **kwargs)
     
     print("\n" + "="*60)
     print("READY FOR TRACKASTRA TRACKING")
@@ -6,18 +6,19 @@ View Trackastra tracking results in napari with tracks layer
 import napari
 import numpy as np
 from pathlib import Path
-from skimage import io
-from skimage.measure import regionprops
+import tifffile
 import glob
+import os
 
 def load_tracked_masks(result_folder):
     """Load tracked mask files"""
     mask_files = sorted(glob.glob(str(result_folder / "mask*.tif")))
     
     if mask_files:
-        masks = [io.imread(f) for f in mask_files]
-        stack = np.array(masks)
-        print(f"Loaded {len(masks)} tracked masks")
+        stack = tifffile.TiffSequence(mask_files).asarray(ioworkers=os.cpu_count())
+        if stack.dtype.itemsize > 2 and stack.max() < 65536:
+            stack = stack.astype(np.uint16, copy=False)
+        print(f"Loaded {len(stack)} tracked masks")
         print(f"Shape: {stack.shape}")
         return stack
     return None
@@ -30,47 +31,54 @@ def load_tracking_graph(result_folder):
         return None
     
     # Format: track_id start_frame end_frame parent_id
-    tracks = {}
-    with open(track_file, 'r') as f:
-        for line in f:
-            parts = line.strip().split()
-            track_id = int(parts[0])
-            start_frame = int(parts[1])
-            end_frame = int(parts[2])
-            parent_id = int(parts[3])
-            tracks[track_id] = {
-                'start': start_frame,
-                'end': end_frame,
-                'parent': parent_id
-            }
+    arr = np.loadtxt(track_file, dtype=np.int64, ndmin=2)
+    tracks = {
+        track_id: {'start': start_frame, 'end': end_frame, 'parent': parent_id}
+        for track_id, start_frame, end_frame, parent_id in arr.tolist()
+    }
     
     return tracks
 
 def extract_centroids_from_masks(masks):
-    """Extract cell centroids for each frame"""
-    centroids = {}  # {frame: {label_id: (y, x)}}
+    """Extract cell centroids for each frame as a (T, max_id + 1, 2) array, NaN where absent"""
+    num_ids = int(masks.max()) + 1
+    centroids = np.full((len(masks), num_ids, 2), np.nan, dtype=np.float32)
     
+    ys, xs = np.mgrid[:masks.shape[1], :masks.shape[2]].astype(np.float32)
+    ys, xs = ys.ravel(), xs.ravel()
     for t in range(len(masks)):
-        centroids[t] = {}
-        props = regionprops(masks[t])
-        for prop in props:
-            centroids[t][prop.label] = prop.centroid
+        flat = masks[t].ravel()
+        cnt = np.bincount(flat, minlength=num_ids)
+        present = cnt > 0
+        present[0] = False
+        cy = np.bincount(flat, weights=ys, minlength=num_ids)
+        cx = np.bincount(flat, weights=xs, minlength=num_ids)
+        centroids[t, present, 0] = cy[present] / cnt[present]
+        centroids[t, present, 1] = cx[present] / cnt[present]
     
     return centroids
 
 def build_tracks_data(masks, tracking_graph):
     """Build napari tracks data from masks and tracking graph"""
     centroids = extract_centroids_from_masks(masks)
-    
-    tracks_data = []  # Format: [[track_id, t, y, x], ...]
-    
-    for track_id, info in tracking_graph.items():
-        for t in range(info['start'], info['end'] + 1):
-            if t in centroids and track_id in centroids[t]:
-                y, x = centroids[t][track_id]
-                tracks_data.append([track_id, t, y, x])
-    
-    return np.array(tracks_data)
+    num_frames, num_ids = centroids.shape[:2]
+    
+    spans = {track_id: (info['start'], min(info['end'], num_frames - 1))
+             for track_id, info in tracking_graph.items() if track_id < num_ids}
+    
+    # Format: [[track_id, t, y, x], ...]
+    num_points = sum(max(end - start + 1, 0) for start, end in spans.values())
+    tracks_data = np.empty((num_points, 4), dtype=np.float32)
+    off = 0
+    for track_id, (start, end) in spans.items():
+        rows = max(end - start + 1, 0)
+        tracks_data[off:off + rows, 0] = track_id
+        tracks_data[off:off + rows, 1] = np.arange(start, end + 1)
+        tracks_data[off:off + rows, 2:] = centroids[start:end + 1, track_id]
+        off += rows
+    
+    # Drop frames in which the track's label is missing from the mask
+    return tracks_data[~np.isnan(tracks_data[:, 2])]
 
 def main():
     base_dir = Path(__file__).parent
@@ -1,9 +1,11 @@
 
+import os
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
 import tifffile
 import torch
-from tqdm import tqdm
 
 from trackastra.model import Trackastra
 from trackastra.tracking import graph_to_ctc, graph_to_napari_tracks
@@ -12,36 +14,27 @@ DATASET_CONFIG = {
     'name': 'REF_Pos101',
     'result': 'result',
     'raw_path': 'data/REF_raw_data101_110 2/Pos101/aphase',
-    'mask_path': 'data/REF_masks101_110 2/Pos101/PreprocessedPhaseMasks'
+    'mask_path': 'data/REF_masks101_110 2/Pos101/PreprocessedPhaseMasks',
+    # torch.compile the model on CPU (needs a working C++ toolchain; falls back to eager)
+    'compile': False,
+    # Experimental: run tracking under fp16 autocast on MPS (needs torch >= 2.5)
+    'half_precision': False,
 }
 
-def load_image_stack(raw_dir):
-    raw_path = Path(raw_dir)
-    image_files = sorted(raw_path.glob('img_*.tiff'))
-    print(f"Loading {len(image_files)} images from {raw_dir}")
-    
-    images = []
-    for img_file in tqdm(image_files, desc="Loading images"):
-        img = tifffile.imread(img_file)
-        images.append(img)
-    
-    imgs = np.stack(images, axis=0)
-    print(f"Image stack shape: {imgs.shape}")
-    return imgs
+def list_frames(directory, pattern):
+    """Sorted frame files in a directory; fails early if there are none"""
+    files = sorted(Path(directory).glob(pattern))
+    if not files:
+        raise FileNotFoundError(f"No files matching {pattern} in {directory}")
+    return files
 
-def load_mask_stack(mask_dir):
-    mask_path = Path(mask_dir)
-    mask_files = sorted(mask_path.glob('MASK_img_*.tif'))
-    
-    print(f"Loading {len(mask_files)} masks from {mask_dir}")
-    
-    masks = []
-    for mask_file in tqdm(mask_files, desc="Loading masks"):
-        mask = tifffile.imread(mask_file)
-        masks.append(mask)
-    
-    masks_stack = np.stack(masks, axis=0)
-    print(f"Mask stack shape: {masks_stack.shape}")
+def load_image_stack(image_files):
+    return tifffile.TiffSequence(image_files).asarray(ioworkers=os.cpu_count())
+
+def load_mask_stack(mask_files):
+    masks_stack = tifffile.TiffSequence(mask_files).asarray(ioworkers=os.cpu_count())
+    if masks_stack.dtype.itemsize > 2 and masks_stack.max() < 65536:
+        masks_stack = masks_stack.astype(np.uint16, copy=False)
     return masks_stack
 
 def main():
@@ -55,8 +48,44 @@ def main():
     print("\n" + "-" * 80)
     print("Loading data...")
     print("-" * 80)
-    imgs = load_image_stack(DATASET_CONFIG['raw_path'])
-    masks = load_mask_stack(DATASET_CONFIG['mask_path'])    
+    image_files = list_frames(DATASET_CONFIG['raw_path'], 'img_*.tiff')
+    mask_files = list_frames(DATASET_CONFIG['mask_path'], 'MASK_img_*.tif')
+    print(f"Loading {len(image_files)} images from {DATASET_CONFIG['raw_path']}")
+    print(f"Loading {len(mask_files)} masks from {DATASET_CONFIG['mask_path']}")
+    
+    # Decode the stacks in the background while the model is being loaded;
+    # the loaders don't print, so the console stays in order
+    loader = ThreadPoolExecutor(max_workers=2)
+    imgs_future = loader.submit(load_image_stack, image_files)
+    masks_future = loader.submit(load_mask_stack, mask_files)
+    loader.shutdown(wait=False)
+    
+    print("\n" + "-" * 80)
+    print("Loading Trackastra model with SAM2.1 features...")
+    print("-" * 80)
+    
+    device = 'mps' if torch.mps.is_available() else 'cpu'
+    print(f"Using device: {device}")
+    
+    model = Trackastra.from_pretrained("general_2d", device=device)
+    # torch.compile has no MPS backend; the number of detections per window
+    # varies, so compile with dynamic shapes to avoid recompiling every frame
+    eager_net = getattr(model, 'transformer', None)
+    compiled = (DATASET_CONFIG['compile'] and device == 'cpu'
+                and isinstance(eager_net, torch.nn.Module))
+    compile_errors = ()  # an empty tuple catches nothing on the eager path
+    if compiled:
+        from torch._dynamo.exc import BackendCompilerFailed
+        compile_errors = (BackendCompilerFailed,)
+        torch.set_float32_matmul_precision('medium')
+        model.transformer = torch.compile(eager_net, dynamic=True)
+        print("Compiled model with torch.compile")
+    print("Model loaded successfully!")
+    
+    imgs = imgs_future.result()
+    masks = masks_future.result()
+    print(f"\nImage stack shape: {imgs.shape}")
+    print(f"Mask stack shape: {masks.shape}")
     assert imgs.shape[0] == masks.shape[0], \
         f"Number of images ({imgs.shape[0]}) and masks ({masks.shape[0]}) must match"
     
@@ -68,20 +97,23 @@ def main():
         masks = masks[:, :imgs.shape[1], :imgs.shape[2]]
         print(f"  Adjusted mask shape: {masks.shape}")
     
-    print("\n" + "-" * 80)
-    print("Loading Trackastra model with SAM2.1 features...")
-    print("-" * 80)
-    
-    device = 'mps' if torch.mps.is_available() else 'cpu'
-    print(f"Using device: {device}")
-    
-    model = Trackastra.from_pretrained("general_2d", device=device)
-    print("Model loaded successfully!")
     print("\n" + "-" * 80)
     print("Running tracking with greedy mode...")
     print("-" * 80)
 
-    track_graph, masks_tracked = model.track(imgs, masks, mode="greedy")
+    half_precision = DATASET_CONFIG['half_precision'] and device == 'mps'
+    if half_precision:
+        print("Using fp16 autocast")
+    amp = torch.autocast(device_type='mps', dtype=torch.float16) if half_precision else nullcontext()
+    with amp:
+        try:
+            track_graph, masks_tracked = model.track(imgs, masks, mode="greedy")
+        except compile_errors:
+            # Inductor compiles lazily on the first forward pass
+            print("torch.compile failed, falling back to eager mode")
+            model.transformer = eager_net
+            torch.set_float32_matmul_precision('highest')
+            track_graph, masks_tracked = model.track(imgs, masks, mode="greedy")
     print(f"Tracking complete! Generated {len(track_graph.nodes())} track nodes")
     
     print("\n" + "-" * 80)
@@ -127,6 +159,8 @@ def main():
         'image_shape': imgs.shape,
         'device': device
     }
+    if half_precision:
+        summary['precision'] = 'float16'
     
     for key, value in summary.items():
         print(f"{key}: {value}")
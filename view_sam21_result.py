@@ -4,12 +4,12 @@ import logging
 from pathlib import Path
 
 import napari
-import numpy as np
-from tqdm import tqdm
-from traccuracy.loaders import load_ctc_data
 
 from divisualisation import Divisualisation
-from divisualisation.utils import load_tiff_timeseries, rescale_intensity
+from divisualisation.utils import load_tiff_timeseries
+
+from ctc_cache import load_ctc_data_cached
+from intensity import rescale_stack
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +23,7 @@ logger.info("Loading SAM2.1 tracking results")
 logger.info(f"Result path: {result_path}")
 logger.info(f"Raw data path: {raw_data_path}")
 
-pred = load_ctc_data(
+pred = load_ctc_data_cached(
     str(result_path),
     str(result_path / "man_track.txt"),
     run_checks=False,
@@ -31,10 +31,7 @@ pred = load_ctc_data(
 )
 
 img = load_tiff_timeseries(raw_data_path)
-img = np.stack([
-    rescale_intensity(_x, pmin=5, pmax=99.9, clip=False, subsample=1)
-    for _x in tqdm(img, desc="Rescale intensity")
-])
+img = rescale_stack(img, pmin=5, pmax=99.9)
 
 v = napari.current_viewer()
 if v is not None: